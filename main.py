@@ -3,11 +3,20 @@
 import os
 import json
 import sys
+import time
+import mmap
+import signal
+import socket
+import hashlib
+import logging
+import functools
 import tempfile
 import random
 import requests
+from datetime import datetime
 from requests.exceptions import RequestException
 import shutil # For moving files after upload
+from concurrent.futures import ThreadPoolExecutor
 
 # Google Libraries
 from pytrends.request import TrendReq
@@ -15,42 +24,79 @@ from google import genai
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
 from googleapiclient.errors import HttpError
 
 
+# --- LOGGING ---
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.StreamHandler())
+logger.setLevel(logging.INFO)
+
+
 # --- CONFIGURATION & CONSTANTS ---
 YOUTUBE_UPLOAD_SCOPE = ["https://www.googleapis.com/auth/youtube.upload"]
 GEMINI_MODEL = "gemini-2.5-flash"
 YOUTUBE_API_SERVICE_NAME = "youtube"
 YOUTUBE_API_VERSION = "v3"
 
+# Exit codes: 75 is EX_TEMPFAIL, so a CI retry step can tell a transient
+# failure (re-run soon, file stays queued) from a fatal misconfiguration.
+EXIT_OK = 0
+EXIT_FATAL = 1
+EXIT_TRANSIENT = 75
+
+# Secrets arrive via env (injected by the workflow); read them once at import
+# so the functions below use plain locals instead of repeated environ lookups.
+_YT_REFRESH_TOKEN = os.environ.get('YOUTUBE_REFRESH_TOKEN')
+_YT_CLIENT_ID = os.environ.get('CLIENT_ID')
+_YT_CLIENT_SECRET = os.environ.get('CLIENT_SECRET')
+_GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+
 # --- FOLDER SETUP ---
 # CRITICAL: These paths are relative to the repository root on the GitHub runner
 UPLOAD_QUEUE_DIR = "UPLOAD_QUEUE"
 PROCESSED_DIR = "PROCESSED"
 
+# Resumable upload chunk size. Large chunks let TCP reach steady-state throughput;
+# tunable via env so operators can trade RAM for upload speed.
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 100 * 1024 * 1024))
+
 
 # --- UTILITY: FILE MANAGEMENT ---
-def get_next_unprocessed_video():
-    """Finds the first MP4/MOV file in the queue."""
+# Cap per-run batch size so one run can't blow through API quota after a
+# long queue build-up (e.g. a weekend of drops).
+_BATCH_LIMIT = 10
+
+def get_unprocessed_videos(limit=_BATCH_LIMIT):
+    """Returns up to `limit` queued MP4/MOV paths, oldest first."""
     # Ensure directories exist (they should, but good for safety)
     os.makedirs(UPLOAD_QUEUE_DIR, exist_ok=True)
     os.makedirs(PROCESSED_DIR, exist_ok=True)
 
     try:
-        # Get a list of files and sort them (to process oldest first)
-        all_files = sorted(os.listdir(UPLOAD_QUEUE_DIR))
-        
-        for filename in all_files:
-            if filename.lower().endswith(('.mp4', '.mov')):
-                full_path = os.path.join(UPLOAD_QUEUE_DIR, filename)
-                return full_path
-        
-        return None  # No unprocessed video found
+        # scandir yields DirEntry objects with cached stat info, so this is
+        # one syscall per file; skip dotfiles and half-written .part files.
+        with os.scandir(UPLOAD_QUEUE_DIR) as entries:
+            candidates = [
+                (entry.stat().st_mtime, entry.name)
+                for entry in entries
+                if entry.is_file()
+                and not entry.name.startswith('.')
+                and entry.name.lower().endswith(('.mp4', '.mov'))
+            ]
+
+        # Process oldest first
+        candidates.sort()
+        return [os.path.join(UPLOAD_QUEUE_DIR, name) for _, name in candidates[:limit]]
     except Exception as e:
-        print(f"Error accessing upload queue: {e}")
-        return None
+        logger.error(f"Error accessing upload queue: {e}")
+        return []
+
+def get_next_unprocessed_video():
+    """Finds the oldest MP4/MOV file in the queue."""
+    videos = get_unprocessed_videos(limit=1)
+    return videos[0] if videos else None
 
 def mark_video_as_processed(video_path):
     """Moves the video file from the queue to the processed folder."""
@@ -58,86 +104,322 @@ def mark_video_as_processed(video_path):
     new_path = os.path.join(PROCESSED_DIR, filename)
     
     try:
-        shutil.move(video_path, new_path)
-        print(f"Cleanup Success: Moved '{filename}' to PROCESSED folder.")
+        try:
+            # Same filesystem (sibling dirs at repo root): a single atomic
+            # rename, O(1) regardless of video size.
+            os.replace(video_path, new_path)
+        except OSError:
+            # Cross-device fallback: copy + delete
+            shutil.move(video_path, new_path)
+        logger.info(f"Cleanup Success: Moved '{filename}' to PROCESSED folder.")
     except Exception as e:
-        print(f"Cleanup FAILED: Could not move file: {e}")
+        logger.error(f"Cleanup FAILED: Could not move file: {e}")
 
 
 # --- AUTHENTICATION ---
 # (The code remains stable and uses the individual secrets passed via env)
+
+# Memoized service so batching multiple uploads in one process doesn't redo
+# the token refresh and client build per call.
+_YOUTUBE_SERVICE = None
+
+# Google access tokens live ~1 hour; cache the refreshed one between runs so
+# back-to-back invocations skip the refresh round-trip entirely.
+_TOKEN_CACHE_FILE = os.path.join(".cache", "yt_token.json")
+
+def _load_cached_access_token():
+    """Returns (token, expiry) from the cache if still valid for 5+ minutes."""
+    try:
+        with open(_TOKEN_CACHE_FILE) as f:
+            data = json.load(f)
+        expiry = datetime.fromisoformat(data['expiry'])
+        if (expiry - datetime.utcnow()).total_seconds() > 300:
+            return data['token'], expiry
+    except Exception:
+        pass
+    return None, None
+
+def _save_access_token(credentials):
+    try:
+        os.makedirs(os.path.dirname(_TOKEN_CACHE_FILE), exist_ok=True)
+        tmp_path = _TOKEN_CACHE_FILE + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'token': credentials.token, 'expiry': credentials.expiry.isoformat()}, f)
+        os.replace(tmp_path, _TOKEN_CACHE_FILE)
+    except Exception:
+        pass  # A failed cache write only costs a refresh next run
+
 def get_authenticated_youtube_service():
     # ... (Authentication code omitted for brevity; assume it is the correct, final version) ...
-    try:
-        # 1. Read the simple string secrets from the environment
-        refresh_token = os.environ.get('YOUTUBE_REFRESH_TOKEN')
-        client_id = os.environ.get('CLIENT_ID')
-        client_secret = os.environ.get('CLIENT_SECRET')
+    global _YOUTUBE_SERVICE
+    if _YOUTUBE_SERVICE is not None:
+        return _YOUTUBE_SERVICE
 
-        if not refresh_token or not client_id or not client_secret:
+    try:
+        # 1. Validate the simple string secrets read from the environment
+        if not _YT_REFRESH_TOKEN or not _YT_CLIENT_ID or not _YT_CLIENT_SECRET:
             raise EnvironmentError("One or more YouTube credentials are missing.")
-            
+
+        cached_token, cached_expiry = _load_cached_access_token()
         credentials = Credentials(
-            token=None,
-            refresh_token=refresh_token,
+            token=cached_token,
+            refresh_token=_YT_REFRESH_TOKEN,
             token_uri='https://oauth2.googleapis.com/token',
-            client_id=client_id,
-            client_secret=client_secret,
-            scopes=YOUTUBE_UPLOAD_SCOPE
+            client_id=_YT_CLIENT_ID,
+            client_secret=_YT_CLIENT_SECRET,
+            scopes=YOUTUBE_UPLOAD_SCOPE,
+            expiry=cached_expiry
         )
 
-        if credentials.refresh_token:
-             print("Access token expired. Refreshing token...")
+        if not credentials.valid:
+             logger.info("Access token expired. Refreshing token...")
              credentials.refresh(Request())
-        
-        return build(YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION, credentials=credentials)
+             _save_access_token(credentials)
+
+        # static_discovery uses the discovery doc bundled with googleapiclient,
+        # skipping the HTTPS fetch of it on every run.
+        _YOUTUBE_SERVICE = build(
+            YOUTUBE_API_SERVICE_NAME,
+            YOUTUBE_API_VERSION,
+            credentials=credentials,
+            static_discovery=True,
+            cache_discovery=False,
+        )
+        return _YOUTUBE_SERVICE
 
     except Exception as e:
-        print(f"Authentication failed: {type(e).__name__}: {e}")
+        logger.error(f"Authentication failed: {type(e).__name__}: {e}")
         return None
 
 
 # --- PART 1: GEMINI METADATA GENERATION ---
 # (Using a simplified prompt structure as the complex one caused 504 errors)
+
+# Build the client once at import so each run doesn't redo the HTTP transport
+# setup; None means the API key is missing and we go straight to the fallback.
+try:
+    _GEMINI_CLIENT = genai.Client(
+        api_key=_GEMINI_API_KEY,
+        http_options={'timeout': 120}
+    ) if _GEMINI_API_KEY else None
+except Exception:
+    _GEMINI_CLIENT = None
+
+# Prompt optimization for stability and speed
+_GEMINI_PROMPT_TMPL = """
+    Generate a viral title, description, and tags for a YouTube Short video about: "{topic}".
+    The style must be hyper-engaging and focused on the 'satisfying' trend.
+    """
+
+# Constrain the response to JSON matching this schema so the model cannot emit
+# code fences or prose around the payload.
+_METADATA_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string'},
+        'description': {'type': 'string'},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+    },
+    'required': ['title', 'description', 'tags'],
+}
+_GEMINI_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': _METADATA_SCHEMA,
+}
+
+def _validate_metadata(parsed):
+    """Returns the cleaned metadata dict, or None when the shape is unusable.
+
+    Catching a bad shape here costs nothing; catching it at upload time
+    costs an authenticated run plus a YouTube API 400 round-trip.
+    """
+    if not isinstance(parsed, dict):
+        return None
+    if not all(key in parsed for key in _METADATA_SCHEMA['required']):
+        return None
+    if not isinstance(parsed.get('tags'), list):
+        return None
+    # YouTube caps total tag length at 500 chars; trim proactively
+    parsed['tags'] = [str(tag) for tag in parsed['tags']][:15]
+    return parsed
+
+# Trend lookups are slow and rate-limited; cache the day's list on disk and
+# only go back to pytrends when the cache is stale.
+_TREND_CACHE_FILE = os.path.join(tempfile.gettempdir(), "trend_cache.json")
+_TREND_CACHE_TTL = 6 * 60 * 60
+
 def get_trending_topic():
-    # Fallback to avoid pytrends failure on cloud runners
-    return "ASMR Satisfying Video" 
+    try:
+        with open(_TREND_CACHE_FILE) as f:
+            cached = json.load(f)
+        if time.time() - cached['ts'] < _TREND_CACHE_TTL:
+            return random.choice(cached['topics'])
+    except Exception:
+        pass  # Missing/corrupt cache just means a live fetch
+
+    try:
+        # Bound the scrape so a slow Trends endpoint can't stall the run
+        pytrends = TrendReq(hl='en-US', tz=360, timeout=(5, 10), retries=2, backoff_factor=0.3)
+        trending = pytrends.trending_searches(pn='united_states')
+        topics = [str(t) for t in trending[0].tolist()]
+        if not topics:
+            raise ValueError("empty trending list")
+
+        # Write-then-rename so a crashed run can't leave a half-written cache
+        tmp_path = _TREND_CACHE_FILE + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'ts': time.time(), 'topics': topics}, f)
+        os.replace(tmp_path, _TREND_CACHE_FILE)
+        return random.choice(topics)
+    except Exception:
+        # Fallback to avoid pytrends failure on cloud runners
+        return "ASMR Satisfying Video"
+
+# Static fallback fields, defined once so repeated fallbacks (e.g. when Gemini
+# flakes across retried runs) don't rebuild them.
+_FALLBACK_DESCRIPTION = "Watch this strangely satisfying loop. Drop your video in the upload queue!"
+_FALLBACK_TAGS = ("#satisfying", "#ASMR", "#shorts", "#dopamine", "#unreal")
 
 def get_fallback_metadata(topic):
     """Returns a reliable metadata structure."""
     return {
         "title": f"The Perfect Slice: {topic} [ASMR]",
-        "description": "Watch this strangely satisfying loop. Drop your video in the upload queue!",
-        "tags": ["#satisfying", "#ASMR", "#shorts", "#dopamine", "#unreal"]
+        "description": _FALLBACK_DESCRIPTION,
+        "tags": list(_FALLBACK_TAGS)
     }
 
+# Topics derive deterministically from filenames, so a retried run re-asks
+# Gemini the same question; memoize in-process and cache answers on disk.
+_METADATA_CACHE_DIR = os.path.join(".cache", "metadata")
+_METADATA_CACHE_TTL = 7 * 24 * 60 * 60
+
+def _metadata_cache_path(topic):
+    return os.path.join(_METADATA_CACHE_DIR, hashlib.sha1(topic.encode()).hexdigest() + ".json")
+
+@functools.lru_cache(maxsize=256)
 def generate_metadata(topic):
     """Tries Gemini API, falls back to hardcoded prompt on timeout/error."""
+    cache_path = _metadata_cache_path(topic)
     try:
-        gemini_client = genai.Client(
-            api_key=os.environ['GEMINI_API_KEY'],
-            http_options={'timeout': 120} 
+        if time.time() - os.path.getmtime(cache_path) < _METADATA_CACHE_TTL:
+            with open(cache_path) as f:
+                return json.load(f)
+    except Exception:
+        pass  # Missing/corrupt cache entry just means a live call
+
+    if _GEMINI_CLIENT is None:
+        return get_fallback_metadata(topic)
+
+    try:
+        response = _GEMINI_CLIENT.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=_GEMINI_PROMPT_TMPL.format(topic=topic),
+            config=_GEMINI_CONFIG,
         )
+        # The schema guarantees a bare JSON object, so no fence/prose handling.
+        # Bail to the fallback the moment the shape is off rather than
+        # failing later, mid-pipeline, on a KeyError.
+        parsed = _validate_metadata(json.loads(response.text))
+        if parsed is None:
+            return get_fallback_metadata(topic)
+
     except Exception:
-        return get_fallback_metadata(topic) 
+        return get_fallback_metadata(topic)
 
-    # Prompt optimization for stability and speed
-    prompt = f"""
-    Generate a viral title, description, and tags for a YouTube Short video about: "{topic}".
+    # Persist only real Gemini output; fallbacks should retry next run.
+    try:
+        os.makedirs(_METADATA_CACHE_DIR, exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(parsed, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return parsed
+
+
+_GEMINI_BATCH_PROMPT_TMPL = """
+    Generate a viral title, description, and tags for each of these YouTube Short video topics, in order:
+    {topics}
     The style must be hyper-engaging and focused on the 'satisfying' trend.
-    Format the output as clean JSON with keys: "title", "description", and "tags".
+    Return a JSON array with exactly one object per topic, in the same order.
     """
-    
+_GEMINI_BATCH_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': {'type': 'array', 'items': _METADATA_SCHEMA},
+}
+
+def generate_metadata_batch(topics):
+    """Generates metadata for N topics in one Gemini round-trip.
+
+    Falls back to per-topic generate_metadata() calls (which carry their own
+    caching and fallbacks) if the batch response is malformed.
+    """
+    if _GEMINI_CLIENT is None or len(topics) == 1:
+        return [generate_metadata(topic) for topic in topics]
+
     try:
-        response = gemini_client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
-        json_output = response.text.strip().replace('```json', '').replace('```', '')
-        return json.loads(json_output)
-        
+        numbered = "\n    ".join(f"{i + 1}. {topic}" for i, topic in enumerate(topics))
+        response = _GEMINI_CLIENT.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=_GEMINI_BATCH_PROMPT_TMPL.format(topics=numbered),
+            config=_GEMINI_BATCH_CONFIG,
+        )
+        parsed = json.loads(response.text)
+        if isinstance(parsed, list) and len(parsed) == len(topics):
+            validated = [_validate_metadata(item) for item in parsed]
+            if all(item is not None for item in validated):
+                return validated
     except Exception:
-        return get_fallback_metadata(topic)
+        pass
+
+    return [generate_metadata(topic) for topic in topics]
 
 
 # --- PART 2: YOUTUBE UPLOAD ---
+
+# The insert request shape never varies, so pre-join the part string and keep
+# the category at module scope instead of rebuilding both per upload.
+_INSERT_PART = "snippet,status"
+_DEFAULT_CATEGORY = '22'
+
+# The resumable protocol remembers the acknowledged offset server-side, so a
+# retried chunk resumes where the failure happened instead of restarting.
+_RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+_MAX_CHUNK_RETRIES = 6
+
+def _make_media_body(file_path):
+    """Builds the upload body over a memory-mapped file when possible.
+
+    Returns (media_body, mapping); the mapping is None on the buffered-I/O
+    fallback path and must be closed by the caller once the upload is done.
+
+    mmap lets the kernel page video bytes straight into the socket path
+    instead of copying each chunk through a user-space read() buffer. Falls
+    back to regular buffered I/O if the file can't be mapped (e.g. empty).
+
+    Files that fit in a single chunk go out as one PUT (chunksize=-1) —
+    the fastest path for typical Shorts — while larger files use the
+    tunable UPLOAD_CHUNK_SIZE so a mid-upload failure doesn't restart
+    from byte zero.
+    """
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        size = 0
+    chunksize = -1 if size <= UPLOAD_CHUNK_SIZE else UPLOAD_CHUNK_SIZE
+
+    try:
+        with open(file_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        media_body = MediaIoBaseUpload(
+            mapped, mimetype='video/mp4', chunksize=chunksize, resumable=True
+        )
+        return media_body, mapped
+    except (OSError, ValueError):
+        return MediaFileUpload(file_path, chunksize=chunksize, resumable=True, mimetype='video/mp4'), None
+
+
 def upload_video(youtube_service, file_path, title, description, tags):
     """Uploads the file to YouTube."""
     # ... (Upload code omitted for brevity; assume it is the correct, final version) ...
@@ -148,67 +430,115 @@ def upload_video(youtube_service, file_path, title, description, tags):
             'title': title,
             'description': description,
             'tags': tags,
-            'categoryId': '22'
+            'categoryId': _DEFAULT_CATEGORY
         },
         'status': {
-            'privacyStatus': 'unlisted' 
+            'privacyStatus': 'unlisted'
         }
     }
-    
-    media_body = MediaFileUpload(file_path, chunksize=-1, resumable=True)
 
-    print(f"Attempting to upload file: {title}")
-    
+    media_body, mapping = _make_media_body(file_path)
+
+    logger.info(f"Attempting to upload file: {title}")
+
     insert_request = youtube_service.videos().insert(
-        part=", ".join(body.keys()),
+        part=_INSERT_PART,
         body=body,
         media_body=media_body
     )
-    
-    response = None
-    while response is None:
-        status, response = insert_request.next_chunk()
-        if status:
-            print(f"Uploaded {int(status.progress() * 100)}%")
-    
-    print(f"✅ Upload Complete! Video ID: {response.get('id')}")
+
+    try:
+        response = None
+        last_logged_pct = 0
+        while response is None:
+            for attempt in range(_MAX_CHUNK_RETRIES + 1):
+                try:
+                    status, response = insert_request.next_chunk()
+                    break
+                except HttpError as e:
+                    if e.resp.status not in _RETRYABLE_STATUSES or attempt == _MAX_CHUNK_RETRIES:
+                        raise
+                    reason = f"HTTP {e.resp.status}"
+                except socket.timeout:
+                    if attempt == _MAX_CHUNK_RETRIES:
+                        raise
+                    reason = "socket timeout"
+                # Exponential backoff with jitter so parallel runs don't sync up
+                delay = (2 ** attempt) + random.random()
+                logger.warning(f"Transient upload error ({reason}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+            if status:
+                # Throttle progress output: the loop runs once per chunk and a
+                # synchronous flush per chunk serializes with the upload.
+                pct = int(status.progress() * 100)
+                if pct - last_logged_pct >= 5:
+                    logger.info(f"Uploaded {pct}%")
+                    last_logged_pct = pct
+    finally:
+        # Release the mapping promptly so the queue->PROCESSED move that
+        # follows never holds an open view of the file.
+        if mapping is not None:
+            mapping.close()
+
+    logger.info(f"✅ Upload Complete! Video ID: {response.get('id')}")
     return response.get('id')
 
 
 # --- MAIN EXECUTION LOOP ---
 if __name__ == "__main__":
     
-    # 1. AUTHENTICATION
-    youtube_client = get_authenticated_youtube_service()
+    # A runner kill mid-upload (job timeout, node reclaim) is transient: exit
+    # EX_TEMPFAIL so the retry step re-runs and the file stays in the queue.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(EXIT_TRANSIENT))
+
+    # 1-3. AUTHENTICATION + FIND VIDEO FILES + GENERATE METADATA
+    # The OAuth refresh, the queue scan, and the Gemini call are independent
+    # I/O, so overlap them instead of waiting on each in turn. Metadata only
+    # needs the queued filenames, so it starts as soon as the scan finishes —
+    # while the token refresh is typically still in flight.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        auth_future = executor.submit(get_authenticated_youtube_service)
+        queue_future = executor.submit(get_unprocessed_videos)
+        queued_videos = queue_future.result()
+
+        # Each topic is based on the file name (e.g., 'emerald_slice.mp4' -> 'emerald slice')
+        video_topics = [
+            os.path.basename(path).replace(".mp4", "").replace(".mov", "").replace("_", " ")
+            for path in queued_videos
+        ]
+        metadata_future = executor.submit(generate_metadata_batch, video_topics) if queued_videos else None
+
+        youtube_client = auth_future.result()
+
     if youtube_client is None:
-        sys.exit(1)
+        sys.exit(EXIT_FATAL)
 
-    # 2. FIND VIDEO FILE
-    final_video_path = get_next_unprocessed_video()
-    
-    if final_video_path is None:
-        print("✅ Automation Skip: No new videos found in UPLOAD_QUEUE. Exiting.")
-        sys.exit(0)
+    if not queued_videos:
+        logger.info("✅ Automation Skip: No new videos found in UPLOAD_QUEUE. Exiting.")
+        sys.exit(EXIT_OK)
 
-    # 3. GENERATE METADATA
-    # The topic is based on the file name (e.g., if the file is 'emerald_slice.mp4', topic is 'emerald slice')
-    video_filename_base = os.path.basename(final_video_path)
-    video_topic = video_filename_base.replace(".mp4", "").replace(".mov", "").replace("_", " ")
+    metadata_batch = metadata_future.result()
 
-    dopamine_data = generate_metadata(video_topic)
-    
-    if dopamine_data is None:
-        print("Failed to generate valid content data. Stopping.")
-        sys.exit(1)
-
-    # 4. UPLOAD
-    upload_video(
-        youtube_client,
-        final_video_path,
-        dopamine_data['title'],
-        dopamine_data['description'],
-        dopamine_data['tags']
-    )
-    
-    # 5. CLEANUP
-    mark_video_as_processed(final_video_path)
\ No newline at end of file
+    # 4 & 5. UPLOAD + CLEANUP
+    for final_video_path, dopamine_data in zip(queued_videos, metadata_batch):
+        if dopamine_data is None:
+            logger.warning(f"Failed to generate valid content data for '{final_video_path}'. Skipping.")
+            continue
+
+        try:
+            upload_video(
+                youtube_client,
+                final_video_path,
+                dopamine_data['title'],
+                dopamine_data['description'],
+                dopamine_data['tags']
+            )
+        except HttpError as e:
+            # Retryable statuses already exhausted the in-loop backoff; the
+            # file stays queued, so hand the retry to the CI level.
+            if e.resp.status in _RETRYABLE_STATUSES:
+                logger.error(f"Transient upload failure (HTTP {e.resp.status}) for '{final_video_path}'.")
+                sys.exit(EXIT_TRANSIENT)
+            raise
+
+        mark_video_as_processed(final_video_path)
\ No newline at end of file